@@ -8,10 +8,14 @@ from functools import wraps
 import os
 from dotenv import load_dotenv
 import random 
+import gzip
+import json
+import click
 import razorpay # NEW: For payment gateway integration
 
 # Database and Cloudinary Imports
 from pymongo import MongoClient
+from pymongo.errors import DuplicateKeyError
 from bson.objectid import ObjectId
 import cloudinary
 import cloudinary.uploader
@@ -31,6 +35,20 @@ bcrypt = Bcrypt(app)
 MONGO_URI = os.getenv("MONGO_URI")
 DB_NAME = os.getenv("DB_NAME")
 
+# Game history archival (settled rounds/bets older than this move out of the hot collections)
+ARCHIVE_RETENTION_DAYS = int(os.getenv("ARCHIVE_RETENTION_DAYS", "30"))
+# Optional: also write gzipped JSONL here. Must be OUTSIDE the app directory, which is served publicly
+# (static_folder='.'); archival refuses to run if it points inside it.
+ARCHIVE_EXPORT_DIR = os.getenv("ARCHIVE_EXPORT_DIR")
+ARCHIVE_EXPORT_DIR_IS_PUBLIC = bool(ARCHIVE_EXPORT_DIR) and os.path.commonpath(
+    [os.path.realpath(ARCHIVE_EXPORT_DIR), os.path.realpath(app.static_folder)]
+) == os.path.realpath(app.static_folder)
+if ARCHIVE_EXPORT_DIR_IS_PUBLIC:
+    print(f"⚠️ ARCHIVE_EXPORT_DIR ({ARCHIVE_EXPORT_DIR}) is inside the public static folder; archival is disabled.")
+ARCHIVE_BATCH_SIZE = 5000
+ARCHIVE_KEEP_ROUNDS = 10  # Latest processed rounds always stay hot (status page + next round_id)
+ARCHIVE_LOCK_TTL = timedelta(minutes=10)  # Renewed every batch; a crashed run's lock expires after this
+
 # Razorpay Configuration (Must be set in .env)
 RAZORPAY_KEY_ID = os.getenv("RAZORPAY_KEY_ID")
 RAZORPAY_KEY_SECRET = os.getenv("RAZORPAY_KEY_SECRET")
@@ -54,6 +72,8 @@ try:
     wallets_collection = db['wallets']
     predictions_collection = db['predictions']
     game_rounds_collection = db['game_rounds'] 
+    game_daily_summaries_collection = db['game_daily_summaries']
+    game_locks_collection = db['game_locks']
     
     print("✅ MongoDB connection successful.")
 except Exception as e:
@@ -564,6 +584,206 @@ def get_game_status():
     })
 
 
+# ----------------------------------------------------------------------
+# --- 8B. GAME HISTORY ARCHIVAL ---
+# ----------------------------------------------------------------------
+
+def ensure_game_indexes():
+    """Creates the indexes behind the status page, settlement and archival scans."""
+    predictions_collection.create_index([("status", 1), ("placed_at", 1)])
+    game_rounds_collection.create_index([("round_id", -1)])
+    game_rounds_collection.create_index([("is_processed", 1), ("round_id", -1)])
+    game_daily_summaries_collection.create_index([("day", 1)], unique=True)
+    predictions_collection.create_index([("archive_batch", 1)], sparse=True)
+    game_rounds_collection.create_index([("archive_batch", 1)], sparse=True)
+
+def _summarize_round(update, round_doc):
+    """Folds an archived round into its day's summary update."""
+    update["$inc"]["rounds"] = update["$inc"].get("rounds", 0) + 1
+    color_key = f"rounds_by_color.{round_doc['winning_color']}"
+    update["$inc"][color_key] = update["$inc"].get(color_key, 0) + 1
+    update["$inc"]["round_payout"] = update["$inc"].get("round_payout", 0) + round_doc.get('total_payout', 0)
+    update["$min"]["first_round_id"] = min(update["$min"].get("first_round_id", round_doc['round_id']), round_doc['round_id'])
+    update["$max"]["last_round_id"] = max(update["$max"].get("last_round_id", round_doc['round_id']), round_doc['round_id'])
+
+def _summarize_prediction(update, bet):
+    """Folds an archived (settled) bet into its day's summary update."""
+    prediction = bet.get('prediction') if bet.get('prediction') in ('red', 'green', 'violet') else 'other'
+    increments = {
+        "bets": 1,
+        f"bets_{bet['status']}": 1,
+        f"bets_by_color.{prediction}": 1,
+        "bets_amount": bet.get('amount', 0),
+        "bets_winnings": bet.get('winnings', 0),
+    }
+    for key, value in increments.items():
+        update["$inc"][key] = update["$inc"].get(key, 0) + value
+
+def _export_archived_docs(collection_name, batch_id, day, docs):
+    """Writes one batch's documents for one day to a gzipped JSONL file (rewritten on retry, never appended)."""
+    os.makedirs(ARCHIVE_EXPORT_DIR, exist_ok=True)
+    path = os.path.join(ARCHIVE_EXPORT_DIR, f"{collection_name}-{day}-{batch_id}.jsonl.gz")
+    with gzip.open(path, 'wt', encoding='utf-8') as export_file:
+        for doc in docs:
+            export_file.write(json.dumps(doc, default=str) + "\n")
+
+def _apply_archive_batch(collection, batch_id, date_field, summarize):
+    """Exports, summarizes and deletes one marked batch. Safe to re-run after an interrupted run."""
+    batch = list(collection.find({"archive_batch": batch_id}))
+
+    docs_by_day = {}
+    for doc in batch:
+        docs_by_day.setdefault(doc[date_field].strftime("%Y-%m-%d"), []).append(doc)
+
+    for day, day_docs in docs_by_day.items():
+        # Skip re-exporting a day this batch already finished (its documents may be partly deleted)
+        already_applied = game_daily_summaries_collection.find_one({"day": day, "archive_batches": batch_id}, {"_id": 1})
+        if ARCHIVE_EXPORT_DIR and not already_applied:
+            _export_archived_docs(collection.name, batch_id, day, day_docs)
+
+        update = {"$inc": {}, "$min": {}, "$max": {}}
+        for doc in day_docs:
+            summarize(update, doc)
+        update = {op: fields for op, fields in update.items() if fields}
+        update["$set"] = {"last_archived_at": datetime.now()}
+        update["$push"] = {"archive_batches": batch_id}
+
+        # Each summary lists the batches folded into it. If this batch is already there the
+        # filter misses, the upsert collides with the unique `day` index and nothing is counted twice.
+        try:
+            game_daily_summaries_collection.update_one(
+                {"day": day, "archive_batches": {"$ne": batch_id}}, update, upsert=True
+            )
+        except DuplicateKeyError:
+            pass
+
+    collection.delete_many({"archive_batch": batch_id})
+    return len(batch)
+
+def _acquire_archive_lock():
+    """Takes the archive run lock. Returns the owner token, or None if another live run holds it."""
+    owner = ObjectId()
+    now = datetime.now()
+    try:
+        # Matches only an expired lock; if a live one exists the upsert collides on _id
+        game_locks_collection.find_one_and_update(
+            {"_id": "archive", "expires_at": {"$lt": now}},
+            {"$set": {"owner": owner, "expires_at": now + ARCHIVE_LOCK_TTL}},
+            upsert=True
+        )
+        return owner
+    except DuplicateKeyError:
+        return None
+
+def _renew_archive_lock(owner):
+    """Extends the lock before each batch; aborts the run if it expired and another run took over."""
+    result = game_locks_collection.update_one(
+        {"_id": "archive", "owner": owner},
+        {"$set": {"expires_at": datetime.now() + ARCHIVE_LOCK_TTL}}
+    )
+    if result.matched_count == 0:
+        raise RuntimeError("Archive lock lost to another run; stopping.")
+
+def _release_archive_lock(owner):
+    game_locks_collection.delete_one({"_id": "archive", "owner": owner})
+
+def _archive_collection(collection, query, date_field, summarize, lock_owner):
+    """Moves documents matching `query` into per-day summaries, batch by batch. Returns the count moved."""
+    archived_count = 0
+
+    # Finish any batch an interrupted run marked but did not delete (the run lock
+    # guarantees no other live run owns these)
+    for batch_id in collection.distinct("archive_batch"):
+        _renew_archive_lock(lock_owner)
+        archived_count += _apply_archive_batch(collection, batch_id, date_field, summarize)
+
+    while True:
+        _renew_archive_lock(lock_owner)
+        batch_query = {**query, "archive_batch": {"$exists": False}}
+        doc_ids = [doc['_id'] for doc in collection.find(batch_query, {"_id": 1}).limit(ARCHIVE_BATCH_SIZE)]
+        if not doc_ids:
+            break
+
+        # Never re-stamp a document another batch already claimed
+        batch_id = ObjectId()
+        collection.update_many(
+            {"_id": {"$in": doc_ids}, "archive_batch": {"$exists": False}},
+            {"$set": {"archive_batch": batch_id}}
+        )
+        archived_count += _apply_archive_batch(collection, batch_id, date_field, summarize)
+
+    return archived_count
+
+def archive_game_history(retention_days=ARCHIVE_RETENTION_DAYS):
+    """Moves settled rounds and bets older than the retention window out of the hot collections.
+
+    Returns the archived counts, or None if another run holds the lock or the export dir is public.
+    """
+    if ARCHIVE_EXPORT_DIR_IS_PUBLIC:
+        print(f"❌ Refusing to archive: ARCHIVE_EXPORT_DIR ({ARCHIVE_EXPORT_DIR}) would expose bet history publicly.")
+        return None
+
+    lock_owner = _acquire_archive_lock()
+    if lock_owner is None:
+        print("⏳ Another archive run is in progress; skipping.")
+        return None
+
+    try:
+        ensure_game_indexes()  # The unique `day` index is what makes summary updates idempotent
+        return _archive_game_history(retention_days, lock_owner)
+    finally:
+        _release_archive_lock(lock_owner)
+
+def _archive_game_history(retention_days, lock_owner):
+    cutoff = datetime.now() - timedelta(days=retention_days)
+
+    # The rounds listed on the status page (the last ARCHIVE_KEEP_ROUNDS processed ones) and
+    # everything after them stay hot; generate_game_result() derives the next round_id from the newest.
+    rounds_archived = 0
+    oldest_kept_round = next(
+        game_rounds_collection.find({"is_processed": True}, {"round_id": 1})
+        .sort('round_id', -1).skip(ARCHIVE_KEEP_ROUNDS - 1).limit(1),
+        None
+    )
+    if oldest_kept_round:
+        rounds_archived = _archive_collection(
+            game_rounds_collection,
+            {
+                "is_processed": True,
+                "round_id": {"$lt": oldest_kept_round['round_id']},
+                "result_time": {"$lt": cutoff}
+            },
+            'result_time',
+            _summarize_round,
+            lock_owner
+        )
+
+    # Pending bets are never touched; only won/lost bets are archived.
+    predictions_archived = _archive_collection(
+        predictions_collection,
+        {"status": {"$in": ["won", "lost"]}, "placed_at": {"$lt": cutoff}},
+        'placed_at',
+        _summarize_prediction,
+        lock_owner
+    )
+
+    print(f"📦 Archived {rounds_archived} round(s) and {predictions_archived} bet(s) older than {retention_days} day(s).")
+    return {"rounds_archived": rounds_archived, "predictions_archived": predictions_archived}
+
+
+@app.cli.command('archive-games')
+@click.option('--retention-days', default=ARCHIVE_RETENTION_DAYS, show_default=True, type=click.IntRange(min=0))
+def archive_games_command(retention_days):
+    """Archives settled game history (for cron: `flask --app app archive-games`)."""
+    archive_game_history(retention_days)
+
+@app.cli.command('init-game-indexes')
+def init_game_indexes_command():
+    """Creates the game collection indexes (run once per deploy: `flask --app app init-game-indexes`)."""
+    ensure_game_indexes()
+    print("✅ Game indexes created.")
+
+
 # ----------------------------------------------------------------------
 # --- 9. RAZORPAY PAYMENT API: Create Order and Verify ---
 # ----------------------------------------------------------------------
@@ -657,7 +877,7 @@ def index():
 @app.route('/<path:filename>')
 def serve_static(filename):
     # Security: Prevent direct access to backend/config files
-    if filename in ['app.py', '.env', 'requirements.txt']:
+    if filename in ['app.py', 'bench_archival.py', '.env', 'requirements.txt']:
         return "Access Denied", 403
 
     if filename == 'manifest.json':
@@ -0,0 +1,186 @@
+# bench_archival.py - Status & settlement latency with and without game history archival
+#
+# Usage (needs a reachable MongoDB in MONGO_URI; uses its own throwaway database):
+#   python bench_archival.py --bets 10000000
+#
+# Seeds N settled historical bets (plus rounds) spread over the past year and times the
+# /api/game/status queries and the settlement `status: pending` scan in four states, so the
+# index gain and the archival gain show up separately:
+#   1. no indexes, no archival   (baseline tree behaviour)
+#   2. indexes, no archival
+#   3. indexes + archival
+#   4. archival, no indexes
+# Besides wall time, each query's winning plan stage and documents examined are reported
+# (from explain()), which show the index effect independently of the machine.
+# Keep a run's output with: python bench_archival.py > bench_output.txt
+
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+BENCH_DB_NAME = "akshu_bench_archival"
+os.environ["DB_NAME"] = BENCH_DB_NAME  # Must be set before `app` connects (load_dotenv won't override it)
+
+import app  # noqa: E402
+
+SEED_CHUNK = 50000
+COLORS = ['red', 'green', 'violet']
+
+
+def seed(total_bets, bets_per_round, history_days, pending_bets):
+    """Fills the bench database with settled history plus a few live pending bets."""
+    app.client.drop_database(BENCH_DB_NAME)
+
+    now = datetime.now()
+    total_rounds = max(1, total_bets // bets_per_round)
+    step = timedelta(days=history_days) / total_rounds
+
+    rounds = []
+    for round_id in range(1, total_rounds + 1):
+        rounds.append({
+            "round_id": round_id,
+            "winning_color": random.choice(COLORS),
+            "is_processed": True,
+            "total_payout": 0,
+            "result_time": now - step * (total_rounds - round_id)
+        })
+        if len(rounds) == SEED_CHUNK:
+            app.game_rounds_collection.insert_many(rounds)
+            rounds = []
+    if rounds:
+        app.game_rounds_collection.insert_many(rounds)
+
+    bets = []
+    for i in range(total_bets):
+        round_id = i // bets_per_round + 1
+        won = random.random() < 0.45
+        amount = random.randint(10, 500)
+        bets.append({
+            "user_id": f"user_{random.randint(1, 10000)}",
+            "prediction": random.choice(COLORS),
+            "amount": amount,
+            "status": "won" if won else "lost",
+            "winnings": amount * 2 if won else 0,
+            "processed_round": round_id,
+            "placed_at": now - step * (total_rounds - round_id)
+        })
+        if len(bets) == SEED_CHUNK:
+            app.predictions_collection.insert_many(bets)
+            bets = []
+    if bets:
+        app.predictions_collection.insert_many(bets)
+
+    app.predictions_collection.insert_many([
+        {"user_id": "user_live", "prediction": random.choice(COLORS), "amount": 10,
+         "status": "pending", "placed_at": now}
+        for _ in range(pending_bets)
+    ])
+
+
+def time_ms(fn, repeats):
+    """Returns the median wall time of `fn` in milliseconds."""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def latest_round_cursor():
+    return app.game_rounds_collection.find().sort('round_id', -1).limit(1)
+
+
+def past_results_cursor():
+    return app.game_rounds_collection.find({"is_processed": True}).sort('round_id', -1).limit(10)
+
+
+def pending_bets_cursor():
+    return app.predictions_collection.find({"status": "pending"}).limit(100)
+
+
+def status_queries():
+    """Same queries as get_game_status()."""
+    list(latest_round_cursor())
+    list(past_results_cursor())
+
+
+def settlement_scan():
+    """Same scan as process_round_winnings() (read only, bets are not settled)."""
+    list(pending_bets_cursor())
+
+
+def plan_summary(cursor):
+    """Returns (winning plan stage, documents examined) for a query, e.g. ("COLLSCAN", 10000000)."""
+    explained = cursor.explain()
+    stage = explained["queryPlanner"]["winningPlan"]
+    stage = stage.get("queryPlan", stage)  # MongoDB 7+ (slot-based engine) nests the plan one level down
+    while "inputStage" in stage and stage["stage"] in ("LIMIT", "FETCH", "SORT", "PROJECTION_SIMPLE"):
+        stage = stage["inputStage"]
+    return stage["stage"], explained["executionStats"]["totalDocsExamined"]
+
+
+def drop_game_indexes():
+    """Back to the baseline tree: only the default _id indexes on the hot collections."""
+    app.game_rounds_collection.drop_indexes()
+    app.predictions_collection.drop_indexes()
+
+
+def measure(label, repeats):
+    db = app.client[BENCH_DB_NAME]
+    print(f"\n[{label}]")
+    for name in ("game_rounds", "predictions"):
+        stat = db.command("collstats", name)
+        print(f"  {name:<12} docs={stat['count']:>11,}  size={stat['size'] / 2**20:>9.1f} MiB  "
+              f"indexes={stat['totalIndexSize'] / 2**20:>8.1f} MiB")
+    result = (time_ms(status_queries, repeats), time_ms(settlement_scan, repeats))
+    print(f"  status queries   median {result[0]:10.2f} ms")
+    print(f"  settlement scan  median {result[1]:10.2f} ms")
+    for name, cursor in (("latest round", latest_round_cursor()),
+                         ("past results", past_results_cursor()),
+                         ("pending bets", pending_bets_cursor())):
+        stage, examined = plan_summary(cursor)
+        print(f"  {name:<15}  {stage:<9} docs examined {examined:>11,}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Game status/settlement latency with and without archival.")
+    parser.add_argument('--bets', type=int, default=10_000_000)
+    parser.add_argument('--bets-per-round', type=int, default=100)
+    parser.add_argument('--history-days', type=int, default=365)
+    parser.add_argument('--retention-days', type=int, default=7)
+    parser.add_argument('--pending', type=int, default=100)
+    parser.add_argument('--repeats', type=int, default=50)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    seed(args.bets, args.bets_per_round, args.history_days, args.pending)
+    print(f"Seeded {args.bets:,} bets in {time.perf_counter() - start:.1f} s")
+
+    results = {}
+    results["no indexes, no archival"] = measure("no indexes, no archival (baseline)", args.repeats)
+
+    app.ensure_game_indexes()
+    results["indexes, no archival"] = measure("indexes, no archival", args.repeats)
+
+    start = time.perf_counter()
+    archived = app.archive_game_history(args.retention_days)
+    print(f"\nArchival took {time.perf_counter() - start:.1f} s: {archived}")
+    results["indexes + archival"] = measure("indexes + archival", args.repeats)
+
+    drop_game_indexes()
+    results["archival, no indexes"] = measure("archival, no indexes", args.repeats)
+
+    print(f"\n{'':<26}{'status (ms)':>14}{'settlement (ms)':>18}")
+    for label, (status_ms, settlement_ms) in results.items():
+        print(f"{label:<26}{status_ms:>14.2f}{settlement_ms:>18.2f}")
+
+    app.client.drop_database(BENCH_DB_NAME)
+
+
+if __name__ == '__main__':
+    main()